@@ -1,7 +1,9 @@
 # core/letter.py
 import os
 import time
+import asyncio
 import datetime
+import functools
 import requests
 import threading
 import hashlib
@@ -131,8 +133,35 @@ class LetterGenerator:
             fallback_time = now.replace(hour=21, minute=0, second=0, microsecond=0)
             return now >= fallback_time
     
-    def generate_letter(self, date_str=None):
-        """Generate a letter for the specified date or today"""
+    async def generate_letter_async(self, date_str=None, executor=None):
+        """Generate a letter without blocking the event loop, reporting progress as it goes
+        
+        Yields ("progress", message) tuples at each milestone, then a final
+        ("done", letter_file) tuple (letter_file is None if generation failed).
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        
+        def report(message):
+            # Called from the worker thread; hand the message to the loop thread
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+        
+        future = loop.run_in_executor(executor, functools.partial(self.generate_letter, date_str, progress=report))
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            yield "progress", message
+        
+        yield "done", await future
+    
+    def generate_letter(self, date_str=None, progress=None):
+        """Generate a letter for the specified date or today
+        
+        progress, if given, is called with a short status string at each milestone.
+        """
         if not date_str:
             # Default to today
             date_str = datetime.datetime.now().strftime("%Y%m%d")
@@ -149,6 +178,8 @@ class LetterGenerator:
         
         try:
             # Get key points and previous letters
+            if progress:
+                progress("Gathering today's key points...")
             key_points = self._get_recent_key_points(1)
             previous_letters = self._get_recent_letters(3)
             
@@ -257,9 +288,13 @@ Do not wrap the content in a markdown code block.
 """
                 
                 # Try generating with the main model
+                if progress:
+                    progress("Contacting model...")
                 markdown_content = self._call_api_for_letter(model, api_key, system_prompt, letter_template)
                 
                 if markdown_content:
+                    if progress:
+                        progress("Writing letter...")
                     return self._save_letter(markdown_content, date_str)
                 
                 # If main model failed, try alternate models
@@ -271,9 +306,13 @@ Do not wrap the content in a markdown code block.
                         continue
                     
                     print(f"Trying alternate model for letter generation: {alt_model}")
+                    if progress:
+                        progress(f"Trying {alt_model}...")
                     markdown_content = self._call_api_for_letter(alt_model, api_key, system_prompt, letter_template)
                     
                     if markdown_content:
+                        if progress:
+                            progress("Writing letter...")
                         return self._save_letter(markdown_content, date_str)
                 
                 # If all models failed
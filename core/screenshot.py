@@ -242,6 +242,12 @@ class ScreenshotManager:
         """Get the current screenshot queue"""
         return self.queue
     
+    @property
+    def queue_size(self):
+        """Number of screenshots currently queued"""
+        return len(self.queue)
+    
     def clear_queue(self):
         """Clear the screenshot queue"""
-        self.queue = []
+        # Clear in place so consumers holding the queue reference stay in sync
+        self.queue.clear()
@@ -5,6 +5,10 @@ import datetime
 import time
 import threading
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of file copies run in parallel during a sync pass
+MAX_SYNC_WORKERS = 16
 
 class SyncManager:
     """Manages bidirectional syncing of letters between local and shared folders"""
@@ -66,41 +70,12 @@ class SyncManager:
                     break
                 time.sleep(1)
     
-    def bidirectional_sync(self):
-        """Perform bidirectional sync between local and shared folders"""
-        if not self.shared_folder or not os.path.exists(self.shared_folder):
-            print("Shared folder not configured or not accessible")
-            return False
-        
-        try:
-            # Ensure user folder exists in shared space
-            user_folder = os.path.join(self.shared_folder, self.username)
-            os.makedirs(user_folder, exist_ok=True)
-            
-            # 1. Local to shared sync (outgoing changes)
-            local_to_shared_count = self._sync_local_to_shared()
-            
-            # 2. Shared to local sync (incoming changes from others)
-            shared_to_local_count = self._sync_shared_to_local()
-            
-            # 3. Detect and resolve conflicts
-            conflicts_count = self._detect_and_resolve_conflicts()
-            
-            if local_to_shared_count > 0 or shared_to_local_count > 0 or conflicts_count > 0:
-                print(f"Sync completed: {local_to_shared_count} outgoing, {shared_to_local_count} incoming, {conflicts_count} conflicts resolved")
-                return True
-            return False
-            
-        except Exception as e:
-            print(f"Error during bidirectional sync: {e}")
-            return False
-    
     def _sync_local_to_shared(self):
         """Sync local letters to shared folder"""
-        sync_count = 0
         user_folder = os.path.join(self.shared_folder, self.username)
+        jobs = []
         
-        # Go through all local letters
+        # Go through all local letters and collect the ones that need syncing
         for filename in os.listdir(self.local_folder):
             if not self._is_letter_file(filename):
                 continue
@@ -110,18 +85,47 @@ class SyncManager:
             
             # Check if the letter needs to be synced
             if self._needs_sync(local_path, shared_path):
-                shutil.copy2(local_path, shared_path)
-                self.last_sync_times[filename] = time.time()
-                sync_count += 1
-                print(f"Synced local → shared: {filename}")
+                jobs.append((filename, f"Synced local → shared: {filename}", [(local_path, shared_path)]))
         
-        return sync_count
+        return self._run_copy_jobs(jobs)
+    
+    def _run_copy_jobs(self, jobs):
+        """Run a batch of copy jobs in parallel and return how many succeeded
+        
+        Each job is (sync_key, message, [(src, dst), ...]); the copies inside a
+        job run in order so a backup is always taken before it is overwritten.
+        """
+        if not jobs:
+            return 0
+        
+        def run_job(job):
+            sync_key, message, copies = job
+            try:
+                for src, dst in copies:
+                    shutil.copy2(src, dst)
+            except Exception as e:
+                print(f"Error syncing {sync_key}: {e}")
+                return False
+            self.last_sync_times[sync_key] = time.time()
+            print(message)
+            return True
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_SYNC_WORKERS, len(jobs))) as executor:
+            return sum(executor.map(run_job, jobs))
     
     def bidirectional_sync(self):
         """Perform bidirectional sync between local and shared folders"""
+        counts = self.bidirectional_sync_counts()
+        return counts is not None and any(counts)
+    
+    def bidirectional_sync_counts(self):
+        """Perform bidirectional sync and return (outgoing, incoming, conflicts) counts
+        
+        Returns None if the shared folder is unavailable or the sync failed.
+        """
         if not self.shared_folder or not os.path.exists(self.shared_folder):
             print("Shared folder not configured or not accessible")
-            return False
+            return None
         
         try:
             # Ensure user folder exists in shared space
@@ -139,18 +143,17 @@ class SyncManager:
             
             if local_to_shared_count > 0 or shared_to_local_count > 0 or conflicts_count > 0:
                 print(f"Sync completed: {local_to_shared_count} outgoing, {shared_to_local_count} incoming, {conflicts_count} conflicts resolved")
-                return True
             else:
                 print("Sync completed: No changes detected")
-            return False
+            return (local_to_shared_count, shared_to_local_count, conflicts_count)
             
         except Exception as e:
             print(f"Error during bidirectional sync: {e}")
-            return False
+            return None
 
     def _sync_shared_to_local(self):
         """Sync letters from shared folder to local folder (including own files edited by others)"""
-        sync_count = 0
+        jobs = []
         
         # Exit if no shared folder
         if not self.shared_folder or not os.path.exists(self.shared_folder):
@@ -184,20 +187,16 @@ class SyncManager:
                         
                         # Only sync if content different and shared is newer
                         if shared_hash != local_hash and shared_mod_time > local_mod_time:
-                            # Create backup
+                            # Back up local first, then copy from shared to local
                             backup_path = os.path.join(self.local_folder, f"{filename}.local_backup")
-                            shutil.copy2(local_path, backup_path)
-                            # Copy from shared to local
-                            shutil.copy2(shared_path, local_path)
-                            self.last_sync_times[filename] = time.time()
-                            sync_count += 1
-                            print(f"Synced shared → local (own file updated remotely): {filename}")
+                            jobs.append((filename,
+                                         f"Synced shared → local (own file updated remotely): {filename}",
+                                         [(local_path, backup_path), (shared_path, local_path)]))
                     else:
                         # If local doesn't exist but shared does, copy it
-                        shutil.copy2(shared_path, local_path)
-                        self.last_sync_times[filename] = time.time()
-                        sync_count += 1
-                        print(f"Synced shared → local (own file missing locally): {filename}")
+                        jobs.append((filename,
+                                     f"Synced shared → local (own file missing locally): {filename}",
+                                     [(shared_path, local_path)]))
                 else:
                     # For other users' letters, store in community subfolder
                     local_user_folder = os.path.join(self.local_folder, "_community", username)
@@ -207,12 +206,11 @@ class SyncManager:
                     
                     # Check if the letter needs to be synced
                     if self._needs_sync(shared_path, local_path):
-                        shutil.copy2(shared_path, local_path)
-                        self.last_sync_times[f"{username}/{filename}"] = time.time()
-                        sync_count += 1
-                        print(f"Synced shared → local: {username}/{filename}")
+                        jobs.append((f"{username}/{filename}",
+                                     f"Synced shared → local: {username}/{filename}",
+                                     [(shared_path, local_path)]))
         
-        return sync_count
+        return self._run_copy_jobs(jobs)
     
     def _detect_and_resolve_conflicts(self):
         """Detect and resolve conflicts between local and shared letters"""
@@ -446,6 +444,13 @@ class SyncManager:
         letters = []
         
         if os.path.exists(self.local_folder):
+            # List the shared user folder once instead of stat-ing it per letter
+            synced_names = frozenset()
+            if self.shared_folder:
+                user_folder = os.path.join(self.shared_folder, self.username)
+                if os.path.isdir(user_folder):
+                    synced_names = set(os.listdir(user_folder))
+            
             for filename in os.listdir(self.local_folder):
                 if self._is_letter_file(filename):
                     # Extract date part depending on file extension
@@ -460,17 +465,10 @@ class SyncManager:
                         date = datetime.datetime.strptime(date_str, "%Y%m%d")
                         letter_date = date.strftime("%Y-%m-%d")
                         
-                        # Check if synced
-                        synced = False
-                        if self.shared_folder and os.path.exists(self.shared_folder):
-                            user_folder = os.path.join(self.shared_folder, self.username)
-                            if os.path.exists(os.path.join(user_folder, filename)):
-                                synced = True
-                                    
                         letters.append({
                             'date': letter_date,
                             'date_str': date_str,
-                            'synced': synced,
+                            'synced': filename in synced_names,
                             'format': format
                         })
                     except ValueError:
@@ -204,7 +204,7 @@ def main():
     
     if args.extract_now:
         if screenshot_manager.get_queue():
-            print(f"Extracting key points from {len(screenshot_manager.get_queue())} queued screenshots...")
+            print(f"Extracting key points from {screenshot_manager.queue_size} queued screenshots...")
             key_points_extractor.extract_now()
         else:
             print("No screenshots in queue to extract points from.")
@@ -2,14 +2,62 @@
 import os
 import time
 import sys
+import uuid
+import asyncio
+import datetime
+import functools
 import threading
 import webbrowser
+import schedule
+from collections import deque
+import itertools
+from concurrent.futures import Executor, Future
 from PyQt5.QtCore import Qt, QTimer, QPoint, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QLabel, QSystemTrayIcon, QMenu, QAction,
                            QPushButton, QMessageBox, QFileDialog)
 
+# Upper bound on remembered actions (newest first); older ones fall off automatically
+MAX_ACTION_HISTORY = 200
+# Non-letter actions are dropped once they are older than this (seconds)
+ACTION_MAX_AGE = 3600
+# How long a computed next-letter time stays valid (seconds)
+NEXT_LETTER_CACHE_TTL = 60
+
+# Status colors
+_COLOR_ERR = "#F14C4C"
+_COLOR_OK = "#73C991"
+_COLOR_INFO = "#3794FF"
+
+def _short_err(e, n=30):
+    """Short error text for status messages, without formatting the whole exception"""
+    # Common case: a single message string we can slice directly
+    if len(e.args) == 1 and isinstance(e.args[0], str):
+        return e.args[0][:n]
+    return str(e)[:n]
+
+@functools.lru_cache(maxsize=None)
+def _ui_font(point_size):
+    """Shared bold UI font; built lazily so a QApplication exists first"""
+    return QFont("Segoe UI", point_size, QFont.Bold)
+
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+@functools.lru_cache(maxsize=64)
+def _format_letter_date(date_str):
+    """Format a YYYYMMDD string as "Jan 01, 2023" (None if it isn't a valid date)"""
+    if len(date_str) != 8 or not date_str.isdigit():
+        return None
+    try:
+        month, day = int(date_str[4:6]), int(date_str[6:8])
+        # Rejects impossible dates such as 20240230, as strptime did
+        datetime.date(int(date_str[:4]), month, day)
+        return f"{_MONTHS[month - 1]} {day:02d}, {date_str[:4]}"
+    except (ValueError, IndexError):
+        return None
+
 class ActionType:
     """Types of actions that can be performed"""
     SCREENSHOT = "Screenshot"
@@ -27,7 +75,6 @@ class ActionStatus:
 class NovaAction:
     """Represents an action performed by Nova"""
     def __init__(self, action_type, details=None):
-        import uuid
         self.id = str(uuid.uuid4())[:8]
         self.action_type = action_type
         self.status = ActionStatus.PENDING
@@ -36,6 +83,74 @@ class NovaAction:
         self.error = None
         self.result = None
 
+class DaemonExecutor(Executor):
+    """Executor that runs each job on its own daemon thread
+    
+    Unlike ThreadPoolExecutor, whose workers are joined at interpreter exit,
+    a job stuck in a slow network call never keeps the app alive after quitting.
+    """
+    
+    def __init__(self, thread_name_prefix="nova-bg"):
+        self._thread_name_prefix = thread_name_prefix
+        self._counter = itertools.count(1)
+        self._shutdown = False
+    
+    def submit(self, fn, /, *args, **kwargs):
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        future = Future()
+        
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        
+        thread = threading.Thread(target=run, name=f"{self._thread_name_prefix}-{next(self._counter)}")
+        thread.daemon = True
+        thread.start()
+        return future
+    
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Refuse new jobs; running jobs are daemon threads and are never waited on"""
+        self._shutdown = True
+
+class Tasks:
+    """Runs coroutines on a single shared background event loop"""
+    
+    _loop = None
+    _thread = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _get_loop(cls):
+        """Get the background loop, starting its thread on first use"""
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                cls._thread = threading.Thread(target=cls._loop.run_forever, name="nova-tasks")
+                cls._thread.daemon = True
+                cls._thread.start()
+            return cls._loop
+    
+    @classmethod
+    def do(cls, coro_fn, *args):
+        """Schedule coro_fn(*args) on the background loop (callable from any thread)"""
+        return asyncio.run_coroutine_threadsafe(coro_fn(*args), cls._get_loop())
+    
+    @classmethod
+    def stop(cls):
+        """Stop the background loop if it was started"""
+        with cls._lock:
+            if cls._loop is not None:
+                cls._loop.call_soon_threadsafe(cls._loop.stop)
+                cls._loop = None
+                cls._thread = None
+
 class NovaWindow(QMainWindow):
     """Main desktop UI window"""
     
@@ -153,7 +268,7 @@ class NovaWindow(QMainWindow):
             border-radius: 5px;
             font-weight: bold;
         """)
-        self.status_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        self.status_label.setFont(_ui_font(9))
         self.content_layout.addWidget(self.status_label)
         
         # Web UI Button
@@ -203,7 +318,7 @@ class NovaWindow(QMainWindow):
             color: #FFFFFF;
             font-weight: bold;
         """)
-        self.title_label.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.title_label.setFont(_ui_font(10))
         
         # Control buttons
         hide_button = QPushButton("Hide")
@@ -334,7 +449,7 @@ class NovaWindow(QMainWindow):
             color: #FFFFFF;
             padding: 10px;
         """)
-        self.latest_activity_label.setFont(QFont("Segoe UI", 8, QFont.Bold))
+        self.latest_activity_label.setFont(_ui_font(8))
         self.latest_activity_label.setWordWrap(True)
         self.latest_activity_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         self.latest_activity_label.setFixedHeight(50)
@@ -398,13 +513,13 @@ class NovaWindow(QMainWindow):
                 color = "#DDB100"
             elif recent_action.status == ActionStatus.PROCESSING:
                 status_symbol = "⚙️"
-                color = "#3794FF" 
+                color = _COLOR_INFO
             elif recent_action.status == ActionStatus.COMPLETED:
                 status_symbol = "✓"
-                color = "#73C991"
+                color = _COLOR_OK
             else:
                 status_symbol = "✗"
-                color = "#F14C4C"
+                color = _COLOR_ERR
             
             if recent_action.action_type == ActionType.SCREENSHOT:
                 type_icon = "📷"
@@ -472,13 +587,9 @@ class NovaWindow(QMainWindow):
                             else:  # .md file
                                 date_str = filename[len("nova_letter_"):-3]
                             
-                            try:
-                                import datetime
-                                date = datetime.datetime.strptime(date_str, "%Y%m%d")
-                                letter_date = date.strftime("%b %d, %Y")  # Format as "Jan 01, 2023"
+                            letter_date = _format_letter_date(date_str)  # Format as "Jan 01, 2023"
+                            if letter_date:  # Skip if date can't be parsed
                                 letter_files.append((filename, letter_date, date_str))
-                            except ValueError:
-                                pass  # Skip if date can't be parsed
                 
                 # Sort by date (newest first) and limit to 3 most recent
                 letter_files.sort(key=lambda x: x[2], reverse=True)
@@ -518,7 +629,7 @@ class NovaWindow(QMainWindow):
                 
         except Exception as e:
             print(f"Error updating letter buttons: {e}")
-            label = QLabel(f"Error: {str(e)[:40]}")
+            label = QLabel(f"Error: {_short_err(e, 40)}")
             label.setStyleSheet("color: #FF6666; padding: 6px;")
             self.letter_buttons_layout.addWidget(label)
             self.letter_buttons.append(label)
@@ -556,9 +667,26 @@ class DesktopUI:
     def __init__(self, config, web_ui, screenshot_manager=None, key_points_extractor=None, letter_generator=None, sync_manager=None):
         self.config = config
         self.web_ui = web_ui
-        self.action_history = []
+        self._web_base = f'http://localhost:{web_ui.port}'  # Port is fixed once WebUI exists
+        self.action_history = deque(maxlen=MAX_ACTION_HISTORY)
+        self._action_lock = threading.Lock()  # actions are recorded from worker threads too
         self.stop_event = threading.Event()
         
+        # Shared executor for blocking background work (generation, sync, extraction)
+        self._executor = DaemonExecutor(thread_name_prefix="nova-bg")
+        
+        # Cached "next letter" display string, refreshed when the schedule may have changed
+        self._next_letter_str = ""
+        # (computed at, generation time it was computed for, result)
+        self._next_run_cache = (0.0, None, "")
+        # Letter generation time parsed once; re-parsed only when the config value changes
+        self._gen_time_str = None
+        self._set_generation_time(config.get('letter_generation_time', '21:00'))
+        # Per-day memo of "today's letter exists" (only True is cached, it can't go back)
+        self._letter_exists_cache = None
+        # ((date, generation time), (hour, minute), result) for is_after_generation_time
+        self._after_generation_cache = (None, None, False)
+        
         # Initialize PyQt application
         self.app = QApplication.instance() or QApplication(sys.argv)
         
@@ -572,15 +700,24 @@ class DesktopUI:
         self._setup_timers()
         
         # Use provided components or create new ones if not provided
-        from core.screenshot import ScreenshotManager
-        from core.key_points import KeyPointsExtractor
-        from core.letter import LetterGenerator
-        from core.sync import SyncManager
-        
-        self.screenshot_manager = screenshot_manager or ScreenshotManager(config)
-        self.key_points_extractor = key_points_extractor or KeyPointsExtractor(config, self.screenshot_manager.get_queue())
-        self.letter_generator = letter_generator or LetterGenerator(config)
-        self.sync_manager = sync_manager or SyncManager(config)
+        # (core modules are only imported when we actually need to build one)
+        if screenshot_manager is None:
+            from core.screenshot import ScreenshotManager
+            screenshot_manager = ScreenshotManager(config)
+        if key_points_extractor is None:
+            from core.key_points import KeyPointsExtractor
+            key_points_extractor = KeyPointsExtractor(config, screenshot_manager.get_queue())
+        if letter_generator is None:
+            from core.letter import LetterGenerator
+            letter_generator = LetterGenerator(config)
+        if sync_manager is None:
+            from core.sync import SyncManager
+            sync_manager = SyncManager(config)
+        
+        self.screenshot_manager = screenshot_manager
+        self.key_points_extractor = key_points_extractor
+        self.letter_generator = letter_generator
+        self.sync_manager = sync_manager
     
     def _connect_signals(self):
         """Connect UI signals to handlers"""
@@ -596,35 +733,40 @@ class DesktopUI:
         self.key_points_timer = QTimer()
         self.key_points_timer.timeout.connect(self.check_key_points)
         self.key_points_timer.setInterval(60 * 1000)  # Check every minute
+        self.key_points_timer.setTimerType(Qt.VeryCoarseTimer)
 
-        # UI update timer
+        # UI update timer (status text only changes at second granularity,
+        # so a coarse 1 Hz tick lets the OS batch our wakeups with others)
         self.ui_timer = QTimer()
         self.ui_timer.timeout.connect(self.update_ui)
-        
-        # Action cleanup timer
-        self.cleanup_timer = QTimer()
-        self.cleanup_timer.timeout.connect(self.cleanup_old_actions)
+        self.ui_timer.setTimerType(Qt.CoarseTimer)
+        self.ui_timer.setInterval(1000)
         
         # Letter buttons update timer
         self.letter_buttons_timer = QTimer()
         self.letter_buttons_timer.timeout.connect(self.update_letter_buttons)
         self.letter_buttons_timer.setInterval(15 * 60 * 1000)  # 15 minutes
+        self.letter_buttons_timer.setTimerType(Qt.VeryCoarseTimer)
+        
+        # Coalesces bursts of letter button refresh requests into one rebuild
+        self.letter_buttons_refresh_timer = QTimer()
+        self.letter_buttons_refresh_timer.setSingleShot(True)
+        self.letter_buttons_refresh_timer.setInterval(100)
+        self.letter_buttons_refresh_timer.timeout.connect(self.window.update_letter_buttons)
         
         # Sync timer
         self.sync_timer = QTimer()
-        self.sync_timer.timeout.connect(self.sync_letters)
+        self.sync_timer.timeout.connect(self.sync_letters_now)
         self.sync_timer.setInterval(30 * 60 * 1000)  # 30 minutes
+        self.sync_timer.setTimerType(Qt.VeryCoarseTimer)
     
     def check_key_points(self):
         """Check if key points should be extracted based on queue size"""
         if self.stop_event.is_set():
             return
                 
-        # Get the current queue
-        queue = self.screenshot_manager.get_queue()
-        
-        # Update the key_points_extractor's queue reference
-        self.key_points_extractor.screenshots_queue = queue
+        # The extractor shares the screenshot manager's queue (set at construction)
+        queue = self.key_points_extractor.screenshots_queue
         
         # Check if extraction is already in progress
         if hasattr(self.key_points_extractor, '_extraction_in_progress') and self.key_points_extractor._extraction_in_progress:
@@ -637,32 +779,21 @@ class DesktopUI:
         
         # Check if we have enough screenshots to extract key points
         if len(queue) >= self.key_points_extractor.interval:
-            action = NovaAction(ActionType.KEY_POINTS)
-            action.details = f"Extracting from {len(queue)} screenshots"
-            self.action_history.insert(0, action)
-            action.status = ActionStatus.PROCESSING
+            action = self._begin_action(ActionType.KEY_POINTS, f"Extracting from {len(queue)} screenshots")
             
-            # Run extraction in a separate thread to prevent UI freezing
+            # Run extraction on the worker pool to prevent UI freezing
             def extract_thread():
                 try:
                     key_points_file = self.key_points_extractor.extract_key_points()
                     if key_points_file:
-                        action.status = ActionStatus.COMPLETED
-                        action.result = f"Key points extracted to {os.path.basename(key_points_file)}"
-                        self.window.flash_status("Key points extracted", "#73C991")
+                        self._complete_action(action, f"Key points extracted to {os.path.basename(key_points_file)}",
+                                              "Key points extracted")
                     else:
-                        action.status = ActionStatus.FAILED
-                        action.error = "Failed to extract key points"
-                        self.window.flash_status("Failed to extract key points", "#F14C4C")
+                        self._fail_action(action, "Failed to extract key points")
                 except Exception as e:
-                    action.status = ActionStatus.FAILED
-                    action.error = str(e)
-                    self.window.flash_status(f"Error extracting key points: {str(e)[:30]}", "#F14C4C")
+                    self._fail_action(action, str(e), f"Error extracting key points: {_short_err(e)}")
             
-            # Create and start thread inside the same scope as the function definition
-            thread = threading.Thread(target=extract_thread)
-            thread.daemon = True
-            thread.start()
+            self._executor.submit(extract_thread)
 
     def show(self):
         """Show the main window"""
@@ -675,8 +806,7 @@ class DesktopUI:
     def start(self):
         """Start the desktop UI and associated functionality"""
         # Start timers
-        self.ui_timer.start(100)  # Update UI every 100ms
-        self.cleanup_timer.start(60000)  # Clean up old actions every minute
+        self.ui_timer.start()  # Update UI every second
         self.letter_buttons_timer.start()  # Update letter buttons periodically
         self.sync_timer.start()  # Start sync timer
         self.key_points_timer.start()
@@ -702,7 +832,7 @@ class DesktopUI:
         
         # Log startup
         print("Desktop UI started")
-        self.window.flash_status("Nova Project started", "#73C991", 3000)
+        self.window.flash_status("Nova Project started", _COLOR_OK, 3000)
         
         # Run the app
         return self.app.exec_()
@@ -713,11 +843,15 @@ class DesktopUI:
         
         # Stop timers
         self.ui_timer.stop()
-        self.cleanup_timer.stop()
         self.letter_buttons_timer.stop()
+        self.letter_buttons_refresh_timer.stop()
         self.sync_timer.stop()
         self.key_points_timer.stop()
         
+        # Stop background tasks loop and executor (in-flight jobs die with the process)
+        Tasks.stop()
+        self._executor.shutdown(wait=False)
+        
         # Stop screenshot manager
         self.screenshot_manager.stop()
         
@@ -731,15 +865,20 @@ class DesktopUI:
         thread = threading.Thread(target=self.letter_generator.schedule_daily_letter)
         thread.daemon = True
         thread.start()
+        self._refresh_next_letter_time()
     
     def _start_letter_checker(self):
         """Start the thread that checks for missed letters"""
         def check_and_generate_letter():
             while not self.stop_event.is_set():
-                if self.letter_generator.is_after_generation_time() and not self.letter_generator.check_todays_letter_exists():
+                if self._is_after_generation_time() and not self._todays_letter_exists():
                     print("It's after generation time and today's letter hasn't been generated. Generating now...")
-                    self.window.flash_status("Generating today's letter...", "#3794FF")
+                    self.window.flash_status("Generating today's letter...", _COLOR_INFO)
                     self.letter_generator.generate_letter()
+                    self._letter_exists_cache = None
+                    self._invalidate_next_letter_time()
+                # Pick up reschedules made by the scheduler thread since the last check
+                self._refresh_next_letter_time()
                 time.sleep(60)  # Check every minute
         
         thread = threading.Thread(target=check_and_generate_letter)
@@ -752,16 +891,50 @@ class DesktopUI:
         self.window.update_latest_activity(self.action_history)
         
         # Update status with constant color (no color changes)
-        screenshot_count = len(self.screenshot_manager.get_queue())
-        next_letter_time = self._get_next_letter_time()
+        screenshot_count = self.screenshot_manager.queue_size
+        next_letter_time = self._next_letter_str
         status_text = f"Screenshots: {screenshot_count} | Letter: {next_letter_time}"
         self.window.update_status(status_text)
     
+    def _refresh_next_letter_time(self):
+        """Recompute the cached next-letter time shown in the status bar"""
+        try:
+            self._next_letter_str = self._get_next_letter_time()
+        except Exception as e:
+            print(f"Error computing next letter time: {e}")
+    
+    def _invalidate_next_letter_time(self):
+        """Force the next refresh to recompute the next-letter time"""
+        self._next_run_cache = (0.0, None, "")
+    
     def _get_next_letter_time(self):
-        """Get the time of the next scheduled letter"""
-        import datetime
-        import schedule
+        """Get the time of the next scheduled letter (cached for NEXT_LETTER_CACHE_TTL)"""
+        now_ts = time.time()
+        generation_time = self.config.get('letter_generation_time', '21:00')
+        cached_at, cached_generation_time, cached_result = self._next_run_cache
+        
+        # A changed generation time in config invalidates the cached value
+        if cached_generation_time == generation_time and now_ts - cached_at < NEXT_LETTER_CACHE_TTL:
+            return cached_result
         
+        if generation_time != self._gen_time_str:
+            self._set_generation_time(generation_time)
+        
+        result = self._compute_next_letter_time()
+        self._next_run_cache = (now_ts, generation_time, result)
+        return result
+    
+    def _set_generation_time(self, generation_time):
+        """Parse and store the configured letter generation time (HH:MM)"""
+        self._gen_time_str = generation_time
+        try:
+            self._gen_hour, self._gen_minute = map(int, generation_time.split(':'))
+        except (ValueError, TypeError, AttributeError):
+            # Fall back to 9:00 PM like LetterGenerator does
+            self._gen_hour, self._gen_minute = 21, 0
+    
+    def _compute_next_letter_time(self):
+        """Compute the display string for the next scheduled letter"""
         now = datetime.datetime.now()
         next_run = schedule.next_run()
         
@@ -769,119 +942,159 @@ class DesktopUI:
             return next_run.strftime('%H:%M:%S')
         else:
             # If today's letter exists, show tomorrow's time
-            if self.letter_generator.check_todays_letter_exists():
+            if self._todays_letter_exists():
                 tomorrow = now + datetime.timedelta(days=1)
                 return tomorrow.replace(hour=21, minute=0, second=0).strftime('%H:%M:%S')
             else:
                 # If today's letter doesn't exist and it's after the generation time, show "Due Now"
-                if self.letter_generator.is_after_generation_time():
+                if self._is_after_generation_time():
                     return "Due Now"
                 # Otherwise show today's generation time
-                generation_time = self.config.get('letter_generation_time', '21:00')
-                hour, minute = map(int, generation_time.split(':'))
-                return now.replace(hour=hour, minute=minute, second=0).strftime('%H:%M:%S')
+                return now.replace(hour=self._gen_hour, minute=self._gen_minute, second=0).strftime('%H:%M:%S')
     
-    def cleanup_old_actions(self):
-        """Remove old actions from history"""
-        if self.stop_event.is_set():
-            return
-            
-        current_time = time.time()
-        to_remove = []
+    def _todays_letter_exists(self):
+        """Memoized check_todays_letter_exists; a True answer holds for the rest of the day"""
+        today = datetime.date.today()
+        if self._letter_exists_cache == today:
+            return True
+        
+        exists = self.letter_generator.check_todays_letter_exists()
+        # An in-progress generation also reports True, but it may still fail
+        if exists and not self.letter_generator.is_generation_in_progress():
+            self._letter_exists_cache = today
+        return exists
+    
+    def _is_after_generation_time(self):
+        """Memoized is_after_generation_time; True holds for the day, False for the minute"""
+        now = datetime.datetime.now()
+        key = (now.date(), self.config.get('letter_generation_time', '21:00'))
+        minute = (now.hour, now.minute)
+        cached_key, cached_minute, cached_result = self._after_generation_cache
         
-        for action in self.action_history:
-            # Keep letter actions forever, clean up others after 1 hour
-            if action.action_type != ActionType.LETTER and (current_time - action.creation_time > 3600):
-                to_remove.append(action)
+        if cached_key == key and (cached_result or cached_minute == minute):
+            return cached_result
         
-        for action in to_remove:
-            if action in self.action_history:
-                self.action_history.remove(action)
+        result = self.letter_generator.is_after_generation_time()
+        self._after_generation_cache = (key, minute, result)
+        return result
+    
+    def _begin_action(self, action_type, details):
+        """Record a new action as processing and return it"""
+        action = NovaAction(action_type, details)
+        action.status = ActionStatus.PROCESSING
+        self._add_action(action)
+        return action
+    
+    def _complete_action(self, action, result, message=None):
+        """Mark an action completed and flash a status message (defaults to the result)"""
+        action.status = ActionStatus.COMPLETED
+        action.result = result
+        self.window.flash_status(message or result, _COLOR_OK)
+    
+    def _fail_action(self, action, error, message=None):
+        """Mark an action failed and flash a status message (defaults to the error)"""
+        action.status = ActionStatus.FAILED
+        action.error = error
+        self.window.flash_status(message or error, _COLOR_ERR)
+    
+    def _add_action(self, action):
+        """Record a new action and expire stale non-letter actions from the tail"""
+        with self._action_lock:
+            self.action_history.appendleft(action)
+            
+            # History is newest-first, so walk it oldest-first: once we reach a
+            # recent non-letter action, everything newer is recent too
+            cutoff = time.time() - ACTION_MAX_AGE
+            has_stale = False
+            for old_action in reversed(self.action_history):
+                if old_action.action_type == ActionType.LETTER:
+                    continue  # Letters are kept
+                has_stale = old_action.creation_time < cutoff
+                break
+            
+            if has_stale:
+                # Build the trimmed history aside and swap it in with one assignment,
+                # so the UI timer never sees a half-rebuilt (empty) deque
+                kept = [a for a in self.action_history
+                        if a.action_type == ActionType.LETTER or a.creation_time >= cutoff]
+                self.action_history = deque(kept, maxlen=MAX_ACTION_HISTORY)
     
     def update_letter_buttons(self):
-        """Update letter buttons in the UI"""
-        self.window.update_letter_buttons()
+        """Update letter buttons in the UI (at most one rebuild per 100ms)"""
+        if not self.letter_buttons_refresh_timer.isActive():
+            self.letter_buttons_refresh_timer.start()
     
     def open_web_ui(self):
         """Open the Web UI in the default browser"""
         try:
-            webbrowser.open(f'http://localhost:{self.web_ui.port}')
+            webbrowser.open(self._web_base)
         except Exception as e:
-            self.window.flash_status(f"Error opening web UI: {str(e)[:30]}", "#F14C4C")
+            self.window.flash_status(f"Error opening web UI: {_short_err(e)}", _COLOR_ERR)
     
     def open_letter(self, date_str):
         """Open a specific letter in the web UI"""
         try:
             # Open the letter in the web UI with a hash to indicate which letter to show
-            web_url = f'http://localhost:{self.web_ui.port}/#letter/{date_str}'
-            self.window.flash_status(f"Opening letter from {date_str} in web UI", "#3794FF")
+            web_url = f'{self._web_base}/#letter/{date_str}'
+            self.window.flash_status(f"Opening letter from {date_str} in web UI", _COLOR_INFO)
             webbrowser.open(web_url)
         except Exception as e:
-            self.window.flash_status(f"Error opening letter: {str(e)[:30]}", "#F14C4C")
+            self.window.flash_status(f"Error opening letter: {_short_err(e)}", _COLOR_ERR)
     
     def generate_today_letter(self):
         """Generate today's letter"""
-        # Create a letter action
-        action = NovaAction(ActionType.LETTER)
-        action.details = "Generating letter for today"
-        self.action_history.insert(0, action)
-        action.status = ActionStatus.PROCESSING
-        
-        self.window.flash_status("Generating today's letter...", "#3794FF")
+        action = self._begin_action(ActionType.LETTER, "Generating letter for today")
+        self.window.flash_status("Generating today's letter...", _COLOR_INFO)
         
-        # Generate letter in a separate thread
-        def generate_thread():
-            try:
-                letter_file = self.letter_generator.generate_letter()
-                if letter_file:
-                    action.status = ActionStatus.COMPLETED
-                    action.result = f"Letter generated: {os.path.basename(letter_file)}"
-                    self.window.flash_status("Letter generated successfully", "#73C991")
+        # Generate letter on the shared background loop
+        Tasks.do(self._generate_today_letter_async, action)
+    
+    async def _generate_today_letter_async(self, action):
+        """Run letter generation for an action without blocking the UI"""
+        try:
+            letter_file = None
+            async for event, value in self.letter_generator.generate_letter_async(executor=self._executor):
+                if event == "progress":
+                    self.window.flash_status(value, _COLOR_INFO)
                 else:
-                    action.status = ActionStatus.FAILED
-                    action.error = "Failed to generate letter"
-                    self.window.flash_status("Failed to generate letter", "#F14C4C")
-            except Exception as e:
-                action.status = ActionStatus.FAILED
-                action.error = str(e)
-                self.window.flash_status(f"Error: {str(e)[:30]}", "#F14C4C")
-        
-        thread = threading.Thread(target=generate_thread)
-        thread.daemon = True
-        thread.start()
+                    letter_file = value
+            
+            if letter_file:
+                self._letter_exists_cache = None
+                self._invalidate_next_letter_time()
+                self._refresh_next_letter_time()
+                self._complete_action(action, f"Letter generated: {os.path.basename(letter_file)}",
+                                      "Letter generated successfully")
+            else:
+                self._fail_action(action, "Failed to generate letter")
+        except Exception as e:
+            self._fail_action(action, str(e), f"Error: {_short_err(e)}")
     
     def sync_letters(self):
         """Sync letters based on configuration"""
-        # Create a sync action
-        action = NovaAction(ActionType.SYNC)
-        action.details = "Manual sync"
-        self.action_history.insert(0, action)
-        action.status = ActionStatus.PROCESSING
+        action = self._begin_action(ActionType.SYNC, "Manual sync")
         
         try:
-            self.window.flash_status("Syncing letters...", "#3794FF")
-            # Use bidirectional_sync instead of sync_all_letters for true bidirectional sync
-            result = self.sync_manager.bidirectional_sync()
+            self.window.flash_status("Syncing letters...", _COLOR_INFO)
+            # Use bidirectional sync instead of sync_all_letters for true bidirectional sync
+            counts = self.sync_manager.bidirectional_sync_counts()
+            synced = sum(counts) if counts else 0
             
-            if result:
-                action.status = ActionStatus.COMPLETED
-                action.result = "Letters synced successfully"
-                self.window.flash_status("Letters synced successfully", "#73C991")
+            if synced:
+                self._complete_action(action, f"Synced {synced} letter{'s' if synced != 1 else ''}")
             else:
-                action.status = ActionStatus.COMPLETED
-                action.result = "Sync completed (no changes)"
-                self.window.flash_status("Sync completed (no changes)", "#73C991")
+                self._complete_action(action, "Sync completed (no changes)")
             
         except Exception as e:
-            action.status = ActionStatus.FAILED
-            action.error = str(e)
-            self.window.flash_status(f"Sync error: {str(e)[:30]}", "#F14C4C")
+            self._fail_action(action, str(e), f"Sync error: {_short_err(e)}")
     
     def sync_letters_now(self):
         """Manually trigger letter sync"""
-        thread = threading.Thread(target=self.sync_letters)
-        thread.daemon = True
-        thread.start()
+        Tasks.do(self._sync_letters_async)
+    
+    async def _sync_letters_async(self):
+        """Run a letter sync without blocking the UI"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.sync_letters)
     
     def handle_browse_folder(self, folder_path):
         """Handle folder selection from UI"""
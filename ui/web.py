@@ -5,12 +5,128 @@ import re
 import markdown
 import jinja2
 import hashlib
-from flask import Flask, render_template, jsonify, request, send_from_directory
+import functools
+import uuid
+import tempfile
+import datetime
+import platform
+import subprocess
+from flask import Flask, Response, render_template, request, send_file, send_from_directory, stream_with_context
 from werkzeug.serving import make_server
 
+from data.config import ConfigManager
+from core.sync import SyncManager
+
+# Prefer orjson for API payloads when it's installed
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_dumps = lambda obj: json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+# Gzip large JSON responses when Flask-Compress is installed
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+# Create Windows shortcuts through COM directly when pywin32 is installed
+try:
+    import win32com.client
+except ImportError:
+    win32com = None
+
+# Serve with waitress's thread pool when it's installed, else werkzeug's threaded server
+try:
+    from waitress import create_server
+except ImportError:
+    create_server = None
+
+# Letter filenames: nova_letter_YYYYMMDD.html / nova_letter_YYYYMMDD.md
+_LETTER_RE = re.compile(r'^nova_letter_(\d{8})\.(html|md)$')
+_LETTER_FORMATS = {'html': 'html', 'md': 'markdown'}
+
+# Finished "sync now" jobs kept pollable for tabs that are still waiting on them
+_MAX_SYNC_JOBS = 16
+
+def _letter_date(date_str):
+    """YYYYMMDD -> YYYY-MM-DD, or None when it isn't a real calendar date"""
+    try:
+        datetime.date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
+    except ValueError:
+        return None
+    return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+
+# Install layout: <root>/app/ui/web.py, with Nova.cmd / Nova.sh in <root>
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_APP_DIR = os.path.dirname(_MODULE_DIR)
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+_PLATFORM = platform.system()
+
+# Process umask, read once at import (os.umask can only be queried by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+@functools.cache
+def _windows_startup_folder():
+    """Path to the current user's Windows Startup folder"""
+    return os.path.join(os.environ.get('APPDATA', ''), 
+                        'Microsoft\\Windows\\Start Menu\\Programs\\Startup')
+
+@functools.lru_cache(maxsize=64)
+def _markdown_to_html(content, date_formatted):
+    """Render a markdown letter as a standalone HTML page (cached for repeated saves)"""
+    body = markdown.markdown(content, extensions=['extra', 'sane_lists'])
+    return (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f'<title>Nova Letter - {date_formatted}</title>\n'
+        f'</head>\n<body>\n{body}\n</body>\n</html>\n'
+    )
+
+def _read_letter(path, letter_format):
+    """Read a letter, correcting its format by sniffing the first bytes"""
+    with open(path, 'rb') as f:
+        head = f.read(256)
+        # Same universal-newline translation a text-mode read would do
+        content = (head + f.read()).decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    
+    lead = head.lstrip()
+    if letter_format == 'html':
+        # Double-check it actually looks like HTML
+        if not lead.startswith(b'<'):
+            letter_format = 'markdown'
+    elif lead[:15].lower().startswith((b'<!doctype html', b'<html')):
+        # Markdown file that actually holds an HTML page
+        letter_format = 'html'
+    return content, letter_format
+
+def _json_response(obj, status=200):
+    """Serialize obj into an application/json response"""
+    return Response(_json_dumps(obj), status=status, mimetype='application/json')
+
+def _request_json():
+    """Parse the current request body as JSON"""
+    return _json_loads(request.get_data())
+
 class WebUI:
     """Web UI for Nova Project"""
     
+    # Settings accepted by /api/settings, and those stored as integers
+    _SETTING_KEYS = (
+        'username', 'auto_sync', 'auto_launch', 'shared_folder', 'local_folder',
+        'letter_style', 'letter_language', 'openrouter_api_key', 'app_icon',
+        'screenshot_interval', 'keypoints_threshold', 'screenshot_retention_days',
+        'letter_generation_time', 'sync_frequency_minutes',
+        'screenshot_model', 'keypoints_model', 'letter_model'
+    )
+    _INT_KEYS = frozenset({
+        'screenshot_interval', 'keypoints_threshold',
+        'screenshot_retention_days', 'sync_frequency_minutes'
+    })
+    
     def __init__(self, config, port=11000):
         self.config = config
         self.port = port
@@ -18,15 +134,34 @@ class WebUI:
         self.flask_server = None
         self.selected_folder = None
         
+        # Long-lived helpers shared by all requests
+        self._config_manager = ConfigManager()
+        self._sync_manager = None
+        self._sync_manager_key = None
+        
+        # Background "sync now" jobs, polled through /api/sync_status/<job_id>
+        self._sync_jobs = {}
+        self._sync_jobs_lock = threading.Lock()
+        
         # Create Flask app
         self.app = Flask(
             __name__,
-            static_folder=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'web/static'),
-            template_folder=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'web/templates')
+            static_folder=os.path.join(_APP_DIR, 'web/static'),
+            template_folder=os.path.join(_APP_DIR, 'web/templates')
         )
         
+        # Compress API payloads (community letters are very repetitive JSON)
+        if Compress is not None:
+            self.app.config['COMPRESS_MIMETYPES'] = ['application/json', 'application/x-ndjson']
+            self.app.config['COMPRESS_MIN_SIZE'] = 1024
+            Compress(self.app)
+        
+        # Templates don't change while the app runs: compile them once, up front
+        self._configure_templates()
+        
         # Configure routes
         self._configure_routes()
+        self._configure_cache_headers()
     
     def _configure_routes(self):
         """Configure Flask routes"""
@@ -47,50 +182,29 @@ class WebUI:
         # API routes
         @self.app.route('/api/settings', methods=['GET', 'POST'])
         def api_settings():
-            from data.config import ConfigManager
-            config_manager = ConfigManager()
-            
             if request.method == 'POST':
-                data = request.json
+                data = _request_json()
                 
                 # Normalize folder paths to ensure proper separators
-                if 'local_folder' in data and data['local_folder']:
-                    data['local_folder'] = os.path.normpath(data['local_folder'])
-                    
-                if 'shared_folder' in data and data['shared_folder']:
-                    data['shared_folder'] = os.path.normpath(data['shared_folder'])
-                
-                # Update config
-                updates = {
-                    'username': data.get('username', self.config.get('username')),
-                    'auto_sync': data.get('auto_sync', self.config.get('auto_sync')),
-                    'auto_launch': data.get('auto_launch', self.config.get('auto_launch')),
-                    'shared_folder': data.get('shared_folder', self.config.get('shared_folder')),
-                    'local_folder': data.get('local_folder', self.config.get('local_folder')),
-                    'letter_style': data.get('letter_style', self.config.get('letter_style')),
-                    'letter_language': data.get('letter_language', self.config.get('letter_language')),
-                    'openrouter_api_key': data.get('openrouter_api_key', self.config.get('openrouter_api_key')),
-                    'app_icon': data.get('app_icon', self.config.get('app_icon')),
-                    'screenshot_interval': int(data.get('screenshot_interval', self.config.get('screenshot_interval'))),
-                    'keypoints_threshold': int(data.get('keypoints_threshold', self.config.get('keypoints_threshold'))),
-                    'screenshot_retention_days': int(data.get('screenshot_retention_days', self.config.get('screenshot_retention_days'))),
-                    'letter_generation_time': data.get('letter_generation_time', self.config.get('letter_generation_time')),
-                    'sync_frequency_minutes': int(data.get('sync_frequency_minutes', self.config.get('sync_frequency_minutes'))),
-                    'screenshot_model': data.get('screenshot_model', self.config.get('screenshot_model')),
-                    'keypoints_model': data.get('keypoints_model', self.config.get('keypoints_model')),
-                    'letter_model': data.get('letter_model', self.config.get('letter_model'))
-                }
+                for key in ('local_folder', 'shared_folder'):
+                    if data.get(key):
+                        data[key] = os.path.normpath(data[key])
+                
+                # Update config (only the settings the client sent)
+                updates = {key: (int(data[key]) if key in self._INT_KEYS else data[key])
+                           for key in self._SETTING_KEYS if key in data}
                 
                 # Save to config file
-                if config_manager.update_multiple(updates):
+                if self._config_manager.update_multiple(updates):
                     # Update current config
-                    for key, value in updates.items():
-                        self.config[key] = value
+                    self.config.update(updates)
                     
                     # Create user folder in shared space if it doesn't exist
-                    if self.config.get('shared_folder') and os.path.exists(self.config.get('shared_folder')):
-                        user_folder = os.path.join(self.config.get('shared_folder'), self.config.get('username'))
-                        os.makedirs(user_folder, exist_ok=True)
+                    # (in the background: network shares can be slow to respond)
+                    shared = self.config.get('shared_folder')
+                    if shared:
+                        threading.Thread(target=self._ensure_shared_user_folder,
+                                         args=(shared, self.config.get('username')), daemon=True).start()
                     
                     # Setup auto-launch if enabled
                     if data.get('auto_launch', False):
@@ -98,105 +212,113 @@ class WebUI:
                     else:
                         self._remove_auto_launch()
                     
-                    return jsonify({'status': 'success'})
+                    return _json_response({'status': 'success'})
                 
-                return jsonify({'error': 'Failed to save settings'})
+                return _json_response({'error': 'Failed to save settings'})
             else:
-                return jsonify(self.config)
+                return _json_response(self.config)
         
         @self.app.route('/api/letters')
         def api_letters():
             """Get all letters for the current user (both .html and .md)"""
             letters_folder = self.config.get('local_folder', 'nova_letters')
+            shared_folder = self.config.get('shared_folder')
+            user_folder = os.path.join(shared_folder, self.config.get('username', 'User')) if shared_folder else ''
             letters = []
             
+            # The listing only changes when files are added/removed in these folders
+            etag = self._folders_etag([letters_folder, user_folder])
+            if request.if_none_match.contains(etag):
+                return '', 304
+            
             try:
                 if os.path.exists(letters_folder):
-                    for filename in os.listdir(letters_folder):
-                        if filename.startswith("nova_letter_"):
-                            # Check if it's an html or md file
-                            if filename.endswith(".html") or filename.endswith(".md"):
-                                # Extract date part depending on the extension
-                                if filename.endswith(".html"):
-                                    date_str = filename[len("nova_letter_"):-5]
-                                    format = "html"
-                                else:  # .md file
-                                    date_str = filename[len("nova_letter_"):-3]
-                                    format = "markdown"
-                                
-                                try:
-                                    import datetime
-                                    date = datetime.datetime.strptime(date_str, "%Y%m%d")
-                                    letter_date = date.strftime("%Y-%m-%d")
-                                    
-                                    # Check if synced
-                                    synced = False
-                                    if self.config.get('shared_folder') and os.path.exists(self.config.get('shared_folder')):
-                                        user_folder = os.path.join(self.config.get('shared_folder'), self.config.get('username', 'User'))
-                                        shared_letter_path = os.path.join(user_folder, filename)
-                                        if os.path.exists(shared_letter_path):
-                                            synced = True
-                                        
-                                    letters.append({
-                                        'date': letter_date,
-                                        'date_str': date_str,
-                                        'synced': synced,
-                                        'format': format
-                                    })
-                                except ValueError:
-                                    # Skip if date can't be parsed
-                                    pass
+                    # List the user's shared folder once instead of stat-ing it per letter
+                    synced_names = frozenset()
+                    if user_folder and os.path.isdir(user_folder):
+                        synced_names = set(os.listdir(user_folder))
+                    
+                    with os.scandir(letters_folder) as entries:
+                        entry_names = [entry.name for entry in entries if entry.is_file(follow_symlinks=False)]
+                    
+                    match_letter = _LETTER_RE.match
+                    for filename in entry_names:
+                        # Only html or md letter files with a YYYYMMDD date
+                        match = match_letter(filename)
+                        if not match:
+                            continue
+                        date_str, extension = match.group(1), match.group(2)
+                        letter_date = _letter_date(date_str)
+                        if not letter_date:
+                            continue
+                        
+                        letters.append({
+                            'date': letter_date,
+                            'date_str': date_str,
+                            'synced': filename in synced_names,
+                            'format': _LETTER_FORMATS[extension]
+                        })
             except Exception as e:
                 print(f"Error loading letters: {e}")
             
-            return jsonify(sorted(letters, key=lambda x: x['date'], reverse=True))
+            return self._revalidated_json(sorted(letters, key=lambda x: x['date'], reverse=True), etag)
         
         @self.app.route('/api/community_letters')
         def api_community_letters():
-            """Get community letters (both .html and .md)"""
-            community = {}
+            """Stream community letters (both .html and .md) as NDJSON, one user per line"""
+            shared_folder = self.config.get('shared_folder')
+            user_dirs = []
             
             try:
-                shared_folder = self.config.get('shared_folder')
                 if shared_folder and os.path.exists(shared_folder):
                     # Get all user folders
-                    for username in os.listdir(shared_folder):
-                        user_path = os.path.join(shared_folder, username)
-                        if os.path.isdir(user_path):
-                            user_letters = []
-                            
-                            # Get all letters for this user
-                            for filename in os.listdir(user_path):
-                                if filename.startswith("nova_letter_"):
-                                    # Check if it's an html or md file
-                                    if filename.endswith(".html") or filename.endswith(".md"):
-                                        # Extract date part depending on the extension
-                                        if filename.endswith(".html"):
-                                            date_str = filename[len("nova_letter_"):-5]
-                                            format = "html"
-                                        else:  # .md file
-                                            date_str = filename[len("nova_letter_"):-3]
-                                            format = "markdown"
-                                        
-                                        try:
-                                            import datetime
-                                            date = datetime.datetime.strptime(date_str, "%Y%m%d")
-                                            letter_date = date.strftime("%Y-%m-%d")
-                                            user_letters.append({
-                                                'date': letter_date,
-                                                'date_str': date_str,
-                                                'format': format
-                                            })
-                                        except ValueError:
-                                            # Skip if date can't be parsed
-                                            pass
-                            
-                            if user_letters:
-                                community[username] = sorted(user_letters, key=lambda x: x['date'], reverse=True)
+                    with os.scandir(shared_folder) as user_entries:
+                        user_dirs = [(entry.name, entry.path) for entry in user_entries if entry.is_dir()]
             except Exception as e:
                 print(f"Error loading community letters: {e}")
             
-            return jsonify(community)
+            # One stat per user folder tells us whether any listing changed
+            etag = self._folders_etag([shared_folder] + [path for _, path in user_dirs])
+            if request.if_none_match.contains(etag):
+                return '', 304
+            
+            def generate():
+                match_letter = _LETTER_RE.match
+                for username, user_path in user_dirs:
+                    user_letters = []
+                    
+                    try:
+                        # Get all letters for this user
+                        with os.scandir(user_path) as entries:
+                            entry_names = [entry.name for entry in entries if entry.is_file(follow_symlinks=False)]
+                    except OSError as e:
+                        print(f"Error loading community letters for {username}: {e}")
+                        continue
+                    
+                    for filename in entry_names:
+                        # Only html or md letter files with a YYYYMMDD date
+                        match = match_letter(filename)
+                        if not match:
+                            continue
+                        date_str, extension = match.group(1), match.group(2)
+                        letter_date = _letter_date(date_str)
+                        if not letter_date:
+                            continue
+                        
+                        user_letters.append({
+                            'date': letter_date,
+                            'date_str': date_str,
+                            'format': _LETTER_FORMATS[extension]
+                        })
+                    
+                    if user_letters:
+                        user_letters.sort(key=lambda x: x['date'], reverse=True)
+                        yield _json_dumps({'user': username, 'letters': user_letters}) + b'\n'
+            
+            response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
         
         @self.app.route('/api/letter/<date_str>')
         def api_letter(date_str):
@@ -218,28 +340,37 @@ class WebUI:
                 letter_format = 'markdown'
                 
             if not letter_path:
-                return jsonify({'error': f'Letter for {date_str} not found'}), 404
+                return _json_response({'error': f'Letter for {date_str} not found'}), 404
             
             try:
-                with open(letter_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Force specific format detection based on content
-                if letter_format == 'html':
-                    # Double-check it actually looks like HTML
-                    if not content.strip().startswith('<'):
-                        letter_format = 'markdown'
-                else:  # markdown format
-                    # Double-check it's not actually HTML
-                    if content.strip().startswith('<!DOCTYPE html>') or content.strip().startswith('<html'):
-                        letter_format = 'html'
-                
-                return jsonify({
+                etag = self._file_etag(letter_path)
+                if request.if_none_match.contains(etag):
+                    return '', 304
+                
+                content, letter_format = _read_letter(letter_path, letter_format)
+                
+                return self._revalidated_json({
                     'content': content,
                     'format': letter_format
-                })
+                }, etag)
             except Exception as e:
-                return jsonify({'error': f'Error reading letter: {str(e)}'}), 500
+                return _json_response({'error': f'Error reading letter: {str(e)}'}), 500
+        
+        @self.app.route('/api/letter_raw/<date_str>')
+        def api_letter_raw(date_str):
+            """Stream a letter file as-is, with ETag/Last-Modified/Range handled by send_file"""
+            letters_folder = self.config.get('local_folder', 'nova_letters')
+            
+            for extension, mimetype in (('html', 'text/html'), ('md', 'text/markdown')):
+                letter_path = os.path.join(letters_folder, f"nova_letter_{date_str}.{extension}")
+                if os.path.exists(letter_path):
+                    # Letters change through edits/syncs: always revalidate against the ETag
+                    response = send_file(letter_path, mimetype=mimetype, conditional=True,
+                                         last_modified=os.path.getmtime(letter_path), max_age=0)
+                    response.cache_control.no_cache = True
+                    return response
+            
+            return _json_response({'error': f'Letter for {date_str} not found'}), 404
         
         @self.app.route('/api/community_letter/<username>/<date_str>')
         def api_community_letter(username, date_str):
@@ -247,7 +378,7 @@ class WebUI:
             shared_folder = self.config.get('shared_folder')
             
             if not shared_folder or not os.path.exists(shared_folder):
-                return jsonify({'error': 'Shared folder not configured'}), 404
+                return _json_response({'error': 'Shared folder not configured'}), 404
             
             # Try both formats
             letter_path_html = os.path.join(shared_folder, username, f"nova_letter_{date_str}.html")
@@ -264,70 +395,77 @@ class WebUI:
                 letter_format = 'markdown'
                 
             if not letter_path:
-                return jsonify({'error': f'Letter for {date_str} not found'}), 404
+                return _json_response({'error': f'Letter for {date_str} not found'}), 404
             
             try:
-                with open(letter_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Force specific format detection based on content
-                if letter_format == 'html':
-                    # Double-check it actually looks like HTML
-                    if not content.strip().startswith('<'):
-                        letter_format = 'markdown'
-                else:  # markdown format
-                    # Double-check it's not actually HTML
-                    if content.strip().startswith('<!DOCTYPE html>') or content.strip().startswith('<html'):
-                        letter_format = 'html'
-                
-                return jsonify({
+                etag = self._file_etag(letter_path)
+                if request.if_none_match.contains(etag):
+                    return '', 304
+                
+                content, letter_format = _read_letter(letter_path, letter_format)
+                
+                return self._revalidated_json({
                     'content': content,
                     'format': letter_format
-                })
+                }, etag)
             except Exception as e:
-                return jsonify({'error': f'Error reading letter: {str(e)}'}), 500
+                return _json_response({'error': f'Error reading letter: {str(e)}'}), 500
         
         @self.app.route('/api/sync_letter/<date_str>', methods=['POST'])
         def api_sync_letter(date_str):
             """Sync or unsync a letter"""
-            data = request.json
+            data = _request_json()
             sync_action = data.get('action', 'sync')  # sync or unsync
             
-            from core.sync import SyncManager
-            sync_manager = SyncManager(self.config)
+            sync_manager = self._get_sync_manager()
             
             try:
                 if sync_action == 'sync':
                     result = sync_manager.sync_letter(date_str)
                     if result:
-                        return jsonify({'status': 'synced'})
+                        return _json_response({'status': 'synced'})
                     else:
-                        return jsonify({'error': 'Failed to sync letter'}), 500
+                        return _json_response({'error': 'Failed to sync letter'}), 500
                 else:
                     result = sync_manager.unsync_letter(date_str)
                     if result:
-                        return jsonify({'status': 'unsynced'})
+                        return _json_response({'status': 'unsynced'})
                     else:
-                        return jsonify({'error': 'Failed to unsync letter'}), 500
+                        return _json_response({'error': 'Failed to unsync letter'}), 500
             except Exception as e:
-                return jsonify({'error': f'Error syncing letter: {str(e)}'}), 500
+                return _json_response({'error': f'Error syncing letter: {str(e)}'}), 500
         
         @self.app.route('/api/sync_letters_now', methods=['POST'])
         def api_sync_letters_now():
-            """Sync all letters bidirectionally"""
+            """Start a bidirectional sync in the background and return its job id"""
             try:
-                from core.sync import SyncManager
-                sync_manager = SyncManager(self.config)
-                
-                # Use bidirectional_sync for complete two-way sync
-                result = sync_manager.bidirectional_sync()
-                
-                if result:
-                    return jsonify({'status': 'success', 'message': 'Letters synced successfully'})
-                else:
-                    return jsonify({'status': 'success', 'message': 'Sync completed (no changes detected)'})
+                with self._sync_jobs_lock:
+                    # Don't stack syncs: hand back the one already running
+                    for job_id, job in self._sync_jobs.items():
+                        if job['status'] == 'running':
+                            return _json_response({'status': 'running', 'job_id': job_id}), 202
+                    
+                    # Keep the most recent finished jobs (dicts keep insertion order)
+                    while len(self._sync_jobs) >= _MAX_SYNC_JOBS:
+                        del self._sync_jobs[next(iter(self._sync_jobs))]
+                    job_id = uuid.uuid4().hex
+                    self._sync_jobs[job_id] = {'status': 'running'}
+                
+                threading.Thread(target=self._run_sync_job, args=(job_id,), daemon=True).start()
+                return _json_response({'status': 'running', 'job_id': job_id}), 202
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}), 500
+        
+        @self.app.route('/api/sync_status/<job_id>')
+        def api_sync_status(job_id):
+            """Get the state of a background sync job"""
+            with self._sync_jobs_lock:
+                job = self._sync_jobs.get(job_id)
+                job = dict(job) if job else None
+            
+            if job is None:
+                return _json_response({'error': 'Unknown sync job'}), 404
+            return _json_response(job)
         
         @self.app.route('/api/generate_letter', methods=['POST'])
         def api_generate_letter():
@@ -336,15 +474,15 @@ class WebUI:
                 from core.letter import LetterGenerator
                 letter_generator = LetterGenerator(self.config)
                 threading.Thread(target=letter_generator.generate_letter, daemon=True).start()
-                return jsonify({'status': 'generating'})
+                return _json_response({'status': 'generating'})
             except Exception as e:
-                return jsonify({'error': str(e)}), 500
+                return _json_response({'error': str(e)}), 500
         
         @self.app.route('/api/edit_letter', methods=['POST'])
         def api_edit_letter():
             """Edit a letter (either .html or .md)"""
             try:
-                data = request.json
+                data = _request_json()
                 date_str = data.get('date_str')
                 username = data.get('username')
                 content = data.get('content')
@@ -352,158 +490,239 @@ class WebUI:
                 
                 # Validate input
                 if not date_str or not username or not content:
-                    return jsonify({'error': 'Missing required fields'}), 400
+                    return _json_response({'error': 'Missing required fields'}), 400
                 
-                # Determine the letter path
+                # Determine the letter folder
                 if username == self.config.get('username'):
                     # Edit local letter
                     letters_folder = self.config.get('local_folder', 'nova_letters')
-                    
-                    # First try to find existing letter in either format
-                    letter_path_html = os.path.join(letters_folder, f"nova_letter_{date_str}.html")
-                    letter_path_md = os.path.join(letters_folder, f"nova_letter_{date_str}.md")
-                    
-                    if os.path.exists(letter_path_html):
-                        letter_path = letter_path_html
-                        existing_format = 'html'
-                    elif os.path.exists(letter_path_md):
-                        letter_path = letter_path_md
-                        existing_format = 'markdown'
-                    else:
-                        # Create a new file based on the format
-                        extension = '.html' if format == 'html' else '.md'
-                        letter_path = os.path.join(letters_folder, f"nova_letter_{date_str}{extension}")
-                        existing_format = format
                 else:
                     # Edit shared letter
                     shared_folder = self.config.get('shared_folder')
                     if not shared_folder or not os.path.exists(shared_folder):
-                        return jsonify({'error': 'Shared folder not configured'}), 404
-                    
-                    # First try to find existing letter in either format
-                    letter_path_html = os.path.join(shared_folder, username, f"nova_letter_{date_str}.html")
-                    letter_path_md = os.path.join(shared_folder, username, f"nova_letter_{date_str}.md")
-                    
-                    if os.path.exists(letter_path_html):
-                        letter_path = letter_path_html
-                        existing_format = 'html'
-                    elif os.path.exists(letter_path_md):
-                        letter_path = letter_path_md
-                        existing_format = 'markdown'
-                    else:
-                        return jsonify({'error': 'Letter not found'}), 404
+                        return _json_response({'error': 'Shared folder not configured'}), 404
+                    letters_folder = os.path.join(shared_folder, username)
+                
+                # Find an existing letter in either format with a single directory listing
+                try:
+                    with os.scandir(letters_folder) as entries:
+                        names = {entry.name for entry in entries}
+                except FileNotFoundError:
+                    names = set()
+                
+                if f"nova_letter_{date_str}.html" in names:
+                    existing_name = f"nova_letter_{date_str}.html"
+                elif f"nova_letter_{date_str}.md" in names:
+                    existing_name = f"nova_letter_{date_str}.md"
+                elif username == self.config.get('username'):
+                    # Create a new file based on the format
+                    existing_name = None
+                else:
+                    return _json_response({'error': 'Letter not found'}), 404
+                
+                extension = '.html' if format == 'html' else '.md'
+                letter_path = os.path.join(letters_folder, f"nova_letter_{date_str}{extension}")
                 
                 # Check if we need to convert formats
-                if format != existing_format and os.path.exists(letter_path):
-                    # We're changing formats, so delete the old file after saving the new one
-                    old_path = letter_path
-                    extension = '.html' if format == 'html' else '.md'
-                    new_path = os.path.join(os.path.dirname(letter_path), f"nova_letter_{date_str}{extension}")
-                    letter_path = new_path
-                    
-                    # If new file already exists, remove it for clean overwrite
-                    if os.path.exists(new_path):
-                        os.remove(new_path)
+                old_path = os.path.join(letters_folder, existing_name) if existing_name else None
+                format_changed = old_path is not None and old_path != letter_path
                 
-                # Save the content
+                # Work out the text to save
                 if format == 'markdown' or letter_path.endswith('.md'):
                     # No need to convert markdown content
-                    with open(letter_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
+                    output = content
+                elif content.strip().startswith('#') and not content.strip().startswith('<!DOCTYPE'):
+                    # Content is markdown, convert to HTML
+                    # Format date for the template
+                    date_obj = datetime.datetime.strptime(date_str, "%Y%m%d")
+                    date_formatted = date_obj.strftime("%B %d, %Y")
+                    output = _markdown_to_html(content, date_formatted)
                 else:
-                    # For HTML, check if we need to convert from markdown
-                    if content.strip().startswith('#') and not content.strip().startswith('<!DOCTYPE'):
-                        # Content is markdown, convert to HTML
-                        from core.letter import LetterGenerator
-                        letter_generator = LetterGenerator(self.config)
-                        
-                        # Format date for the template
-                        import datetime
-                        date_obj = datetime.datetime.strptime(date_str, "%Y%m%d")
-                        date_formatted = date_obj.strftime("%B %d, %Y")
-                        
-                        # Convert markdown to HTML
-                        letter_html = letter_generator._process_markdown_to_html(content, date_formatted)
-                        with open(letter_path, 'w', encoding='utf-8') as f:
-                            f.write(letter_html)
-                    else:
-                        # Content is already HTML, save directly
-                        with open(letter_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                
-                # If we changed formats, remove the old file
-                if format != existing_format and os.path.exists(old_path):
+                    # Content is already HTML, save directly
+                    output = content
+                
+                # Editors often re-post identical content: leave the file alone
+                if old_path == letter_path:
+                    with open(letter_path, 'r', encoding='utf-8') as f:
+                        if f.read() == output:
+                            return _json_response({'status': 'unchanged'})
+                
+                # Save the content atomically (replaces any existing file in one step);
+                # a unique temp name keeps concurrent saves from clobbering each other
+                fd, tmp_path = tempfile.mkstemp(dir=letters_folder, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(output)
+                    # mkstemp files are owner-only; shared letters must stay readable to others
+                    os.chmod(tmp_path, 0o666 & ~_UMASK)
+                    os.replace(tmp_path, letter_path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                
+                # We changed formats, so remove the old file
+                if format_changed:
                     try:
                         os.remove(old_path)
                     except Exception as e:
                         print(f"Warning: Could not remove old file {old_path}: {e}")
                 
-                return jsonify({'status': 'success'})
+                return _json_response({'status': 'success'})
             except Exception as e:
-                return jsonify({'error': f'Error saving letter: {str(e)}'}), 500
+                return _json_response({'error': f'Error saving letter: {str(e)}'}), 500
         
         @self.app.route('/api/browse_folder', methods=['GET'])
         def api_browse_folder():
             if self.selected_folder:
                 folder_path = self.selected_folder
                 self.selected_folder = None  # Clear after use
-                return jsonify({'folder_path': folder_path})
+                return _json_response({'folder_path': folder_path})
+            else:
+                return _json_response({'error': 'No folder selected - use desktop UI to select folders'}), 400
+    
+    def _ensure_shared_user_folder(self, shared_folder, username):
+        """Create the user's folder inside an existing shared folder"""
+        try:
+            if os.path.exists(shared_folder):
+                os.makedirs(os.path.join(shared_folder, username), exist_ok=True)
+        except OSError as e:
+            print(f"Error creating shared user folder: {e}")
+    
+    def _run_sync_job(self, job_id):
+        """Run a bidirectional sync and record the outcome under job_id"""
+        try:
+            # Use bidirectional_sync for complete two-way sync
+            if self._get_sync_manager().bidirectional_sync():
+                job = {'status': 'done', 'message': 'Letters synced successfully'}
             else:
-                return jsonify({'error': 'No folder selected - use desktop UI to select folders'}), 400
+                job = {'status': 'done', 'message': 'Sync completed (no changes detected)'}
+        except Exception as e:
+            job = {'status': 'error', 'error': str(e)}
+        
+        with self._sync_jobs_lock:
+            self._sync_jobs[job_id] = job
+    
+    def _get_sync_manager(self):
+        """Return the shared SyncManager, rebuilding it if its folders/username changed"""
+        # SyncManager snapshots these settings on construction
+        key = (self.config.get('username'), self.config.get('shared_folder'), self.config.get('local_folder'))
+        if self._sync_manager is None or key != self._sync_manager_key:
+            self._sync_manager = SyncManager(self.config)
+            self._sync_manager_key = key
+        return self._sync_manager
+    
+    def _configure_templates(self):
+        """Disable template reloading, cache bytecode on disk and pre-compile pages"""
+        self.app.config['TEMPLATES_AUTO_RELOAD'] = False
+        self.app.jinja_env.auto_reload = False
+        
+        try:
+            # No directory: Jinja picks a per-user, mode 0700, owner-checked cache dir
+            self.app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: Could not enable template bytecode cache: {e}")
+        
+        for template_name in ('index.html', 'settings.html'):
+            try:
+                self.app.jinja_env.get_template(template_name)
+            except (jinja2.TemplateError, OSError) as e:
+                print(f"Warning: Could not pre-compile {template_name}: {e}")
+    
+    def _configure_cache_headers(self):
+        """Set Cache-Control on static assets and rendered pages"""
+        static_prefix = (self.app.static_url_path or '/static') + '/'
+        
+        @self.app.after_request
+        def set_cache_control(response):
+            if request.path.startswith(static_prefix):
+                # Only static assets may be kept for a day without revalidation
+                response.headers['Cache-Control'] = 'public, max-age=86400, immutable'
+            elif response.mimetype == 'text/html':
+                # Pages embed live config/letter state, so always revalidate
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+    
+    def _folders_etag(self, folders):
+        """Build an ETag from folder paths and modification times
+        
+        A folder's mtime changes whenever entries are added, removed or renamed,
+        which is all a letter listing depends on.
+        """
+        digest = hashlib.md5()
+        for folder in folders:
+            try:
+                mtime = os.stat(folder).st_mtime_ns if folder else -1
+            except OSError:
+                mtime = -1
+            digest.update(f"{folder}:{mtime}\n".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _file_etag(self, path):
+        """Build an ETag from a file's modification time and size"""
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    
+    def _revalidated_json(self, data, etag):
+        """JSON response the browser may cache but must revalidate with its ETag"""
+        response = _json_response(data)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
     
     def _setup_auto_launch(self):
         """Set up auto-launch at system startup"""
         try:
-            import platform
-            import subprocess
-            import os
-            
-            if platform.system() == 'Windows':
+            if _PLATFORM == 'Windows':
                 # Get the path to the startup folder
-                startup_folder = os.path.join(os.environ.get('APPDATA', ''), 
-                                        'Microsoft\\Windows\\Start Menu\\Programs\\Startup')
+                startup_folder = _windows_startup_folder()
                 
                 # Ensure the startup folder exists
                 os.makedirs(startup_folder, exist_ok=True)
                 
                 # Get the path to Nova.cmd in the root folder
-                app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                root_dir = os.path.dirname(app_dir)  # Go up to the root where Nova.cmd is
-                cmd_path = os.path.join(root_dir, 'Nova.cmd')
+                cmd_path = os.path.join(_ROOT_DIR, 'Nova.cmd')
                 
                 # Check if Nova.cmd exists
                 if not os.path.exists(cmd_path):
                     print(f"Warning: Nova.cmd not found at: {cmd_path}")
                     return
                 
-                # Create a shortcut using PowerShell (more reliable than VBS)
-                ps_command = f'''
-                $WshShell = New-Object -ComObject WScript.Shell
-                $Shortcut = $WshShell.CreateShortcut("{os.path.join(startup_folder, 'Nova Project.lnk')}")
-                $Shortcut.TargetPath = "{cmd_path}"
-                $Shortcut.WorkingDirectory = "{root_dir}"
-                $Shortcut.Save()
-                '''
+                shortcut_path = os.path.join(startup_folder, 'Nova Project.lnk')
                 
-                # Run PowerShell command with hidden window
-                subprocess.run(['powershell', '-Command', ps_command], 
-                            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0)
+                if win32com is not None:
+                    # Same WScript.Shell call as below, without spawning PowerShell
+                    shortcut = win32com.client.Dispatch("WScript.Shell").CreateShortcut(shortcut_path)
+                    shortcut.TargetPath = cmd_path
+                    shortcut.WorkingDirectory = _ROOT_DIR
+                    shortcut.Save()
+                else:
+                    # Create a shortcut using PowerShell (more reliable than VBS)
+                    ps_command = f'''
+                    $WshShell = New-Object -ComObject WScript.Shell
+                    $Shortcut = $WshShell.CreateShortcut("{shortcut_path}")
+                    $Shortcut.TargetPath = "{cmd_path}"
+                    $Shortcut.WorkingDirectory = "{_ROOT_DIR}"
+                    $Shortcut.Save()
+                    '''
+                    
+                    # Run PowerShell command with hidden window
+                    subprocess.run(['powershell', '-Command', ps_command], 
+                                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0)
                 
                 print("Auto-launch enabled on Windows")
                 
-            elif platform.system() == 'Darwin':  # macOS
+            elif _PLATFORM == 'Darwin':  # macOS
                 plist_path = os.path.expanduser('~/Library/LaunchAgents/com.novaproject.launcher.plist')
-                app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                root_dir = os.path.dirname(app_dir)
                 
                 # For macOS, we need a shell script launcher
-                launcher_path = os.path.join(root_dir, 'Nova.sh')
+                launcher_path = os.path.join(_ROOT_DIR, 'Nova.sh')
                 
                 # Create shell script if it doesn't exist
                 if not os.path.exists(launcher_path):
                     with open(launcher_path, 'w') as f:
                         f.write(f'''#!/bin/bash
-    cd "{root_dir}"
+    cd "{_ROOT_DIR}"
     ./python_env/bin/pythonw ./app/nova_app.py
     ''')
                     
@@ -533,21 +752,18 @@ class WebUI:
                 except Exception as e:
                     print(f"Error setting up auto-launch on macOS: {e}")
             
-            elif platform.system() == 'Linux':
+            elif _PLATFORM == 'Linux':
                 autostart_dir = os.path.expanduser('~/.config/autostart')
                 if not os.path.exists(autostart_dir):
                     os.makedirs(autostart_dir)
                 
-                app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                root_dir = os.path.dirname(app_dir)
-                
                 # For Linux, create a shell script launcher if it doesn't exist
-                launcher_path = os.path.join(root_dir, 'Nova.sh')
+                launcher_path = os.path.join(_ROOT_DIR, 'Nova.sh')
                 
                 if not os.path.exists(launcher_path):
                     with open(launcher_path, 'w') as f:
                         f.write(f'''#!/bin/bash
-    cd "{root_dir}"
+    cd "{_ROOT_DIR}"
     ./python_env/bin/pythonw ./app/nova_app.py
     ''')
                     
@@ -576,20 +792,16 @@ class WebUI:
     def _remove_auto_launch(self):
         """Remove auto-launch from system startup"""
         try:
-            import platform
-            import os
-            
-            if platform.system() == 'Windows':
+            if _PLATFORM == 'Windows':
                 # Remove the shortcut from startup folder
-                startup_folder = os.path.join(os.environ.get('APPDATA', ''), 
-                                        'Microsoft\\Windows\\Start Menu\\Programs\\Startup')
+                startup_folder = _windows_startup_folder()
                 shortcut_path = os.path.join(startup_folder, 'Nova Project.lnk')
                 
                 if os.path.exists(shortcut_path):
                     os.remove(shortcut_path)
                     print("Auto-launch disabled on Windows")
             
-            elif platform.system() == 'Darwin':  # macOS
+            elif _PLATFORM == 'Darwin':  # macOS
                 plist_path = os.path.expanduser('~/Library/LaunchAgents/com.novaproject.launcher.plist')
                 if os.path.exists(plist_path):
                     try:
@@ -599,7 +811,7 @@ class WebUI:
                     except Exception as e:
                         print(f"Error removing auto-launch on macOS: {e}")
             
-            elif platform.system() == 'Linux':
+            elif _PLATFORM == 'Linux':
                 desktop_file = os.path.expanduser('~/.config/autostart/novaproject.desktop')
                 if os.path.exists(desktop_file):
                     try:
@@ -619,8 +831,17 @@ class WebUI:
             
         def run_flask():
             try:
-                self.flask_server = make_server('0.0.0.0', self.port, self.app)
-                self.flask_server.serve_forever()
+                if create_server is not None:
+                    self.flask_server = create_server(self.app, host='0.0.0.0', port=self.port, threads=8)
+                    self.flask_server.run()
+                else:
+                    # Threaded so slow letter/sync requests don't stall other tabs
+                    self.flask_server = make_server('0.0.0.0', self.port, self.app, threaded=True)
+                    try:
+                        # Short poll so shutdown() is noticed quickly
+                        self.flask_server.serve_forever(poll_interval=0.2)
+                    finally:
+                        self.flask_server.server_close()
             except Exception as e:
                 print(f"Error starting web server: {e}")
         
@@ -643,7 +864,20 @@ class WebUI:
         """Stop the web server"""
         if self.flask_server:
             try:
-                self.flask_server.shutdown()
+                if create_server is not None:
+                    # waitress: closing the listener ends run()
+                    self.flask_server.close()
+                else:
+                    # shutdown() waits for serve_forever to return, so never call it from
+                    # the server thread itself; server_close() releases the listening socket
+                    if threading.current_thread() is not self.flask_thread:
+                        self.flask_server.shutdown()
+                    self.flask_server.server_close()
+                
+                if self.flask_thread and self.flask_thread is not threading.current_thread():
+                    self.flask_thread.join(timeout=2)
+                    if self.flask_thread.is_alive():
+                        print("Warning: Web server thread did not exit in time")
                 print("Web server stopped")
             except Exception as e:
                 print(f"Error stopping web server: {e}")
@@ -1,15 +1,48 @@
+# util/helpers.py
 import socket
 import subprocess
 import re
 import os
 import tempfile
 import platform
+import functools
+import time
+import datetime
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December")
+
+SECONDS_PER_MINUTE = 60
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# netsh is slow to spawn, so its answer is reused for a short while
+EXCLUDED_PORTS_TTL = 30
+_excluded_cache = {"time": 0.0, "ranges": None, "bitmap": None, "bitmap_ranges": None}
+_NO_EXCLUDED_RANGES = ()
+
+# "  start  end" rows in `netsh ... show excludedportrange` output
+_PORT_RANGE_RE = re.compile(r'(?m)^\s*(\d+)\s+(\d+)')
+
+# Lowest port any mainstream OS hands out for bind(0) (Linux starts at 32768)
+EPHEMERAL_PORT_START = 32768
 
 def get_excluded_port_ranges():
-    """Get the current TCP excluded port ranges dynamically"""
+    """Get the current TCP excluded port ranges dynamically (cached for EXCLUDED_PORTS_TTL seconds)"""
     if platform.system() != 'Windows':
-        return []  # Currently only implemented for Windows
+        return _NO_EXCLUDED_RANGES  # Currently only implemented for Windows
+    
+    now = time.monotonic()
+    if _excluded_cache["ranges"] is not None and now - _excluded_cache["time"] < EXCLUDED_PORTS_TTL:
+        return _excluded_cache["ranges"]
     
+    ranges = _query_excluded_port_ranges()
+    _excluded_cache["time"] = now
+    _excluded_cache["ranges"] = ranges
+    return ranges
+
+def _query_excluded_port_ranges():
+    """Ask netsh for the TCP excluded port ranges"""
     try:
         # Run the netsh command to get current exclusions
         result = subprocess.run(
@@ -20,27 +53,27 @@ def get_excluded_port_ranges():
         )
         
         # Parse the output to extract port ranges
-        ranges = []
-        lines = result.stdout.split('\n')
-        for line in lines:
-            # Look for lines with port ranges
-            match = re.search(r'^\s*(\d+)\s+(\d+)', line)
-            if match:
-                start = int(match.group(1))
-                end = int(match.group(2))
-                ranges.append((start, end))
-        
-        return ranges
+        return [(int(m.group(1)), int(m.group(2))) for m in _PORT_RANGE_RE.finditer(result.stdout)]
     except Exception as e:
         print(f"Warning: Could not get excluded port ranges: {e}")
         return []  # Return empty list if command fails
 
+def _excluded_port_bitmap():
+    """One byte per port, non-zero when excluded (rebuilt whenever the ranges refresh)"""
+    ranges = get_excluded_port_ranges()
+    if _excluded_cache["bitmap_ranges"] is not ranges:
+        bitmap = bytearray(65536)
+        for start, end in ranges:
+            start, end = max(start, 0), min(end, 65535)
+            if start <= end:
+                bitmap[start:end + 1] = b"\x01" * (end - start + 1)
+        _excluded_cache["bitmap"] = bitmap
+        _excluded_cache["bitmap_ranges"] = ranges
+    return _excluded_cache["bitmap"]
+
 def is_port_excluded(port):
     """Check if a port is in the excluded ranges"""
-    for start, end in get_excluded_port_ranges():
-        if start <= port <= end:
-            return True
-    return False
+    return 0 <= port < 65536 and bool(_excluded_port_bitmap()[port])
 
 def is_port_available(port):
     """Check if a specific port is available"""
@@ -54,19 +87,36 @@ def is_port_available(port):
     except OSError:
         return False
 
-def find_available_port(start_range=11000, end_range=12000):
+def _bind_probe(port):
+    """Bind a throwaway socket to port (0 = kernel's choice); return the bound port or None"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # No SO_REUSEADDR: on Windows and macOS/BSD it lets this bind succeed
+            # while another socket is already listening on the port
+            s.bind(('localhost', port))
+            return s.getsockname()[1]
+    except OSError:
+        return None
+
+def find_available_port(start_range=11000, end_range=12000, kernel_attempts=10):
     """Find a port that's available and not in excluded ranges"""
+    excluded = _excluded_port_bitmap()
+    
+    # Let the kernel pick a free port first; it only hands out ephemeral ports,
+    # so this is only worth trying when the range reaches into them
+    if end_range > EPHEMERAL_PORT_START:
+        for _ in range(kernel_attempts):
+            port = _bind_probe(0)
+            if port is not None and start_range <= port < end_range and not excluded[port]:
+                return port
+    
     for port in range(start_range, end_range):
-        if is_port_excluded(port):
+        if excluded[port]:
             continue
             
         # Also check if port is actually bindable
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(('localhost', port))
-                return port
-        except OSError:
-            continue
+        if _bind_probe(port) is not None:
+            return port
             
     raise RuntimeError(f"No available ports found in range {start_range}-{end_range}")
 
@@ -76,12 +126,20 @@ def save_port_to_file(port, filename=None):
         # Use a standard filename in the temp directory
         filename = os.path.join(tempfile.gettempdir(), "nova_app_port.txt")
     
+    tmp_path = None
     try:
-        with open(filename, 'w') as f:
-            f.write(str(port))
+        # Write next to the target and rename over it, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)))
+        try:
+            os.write(fd, str(port).encode())
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, filename)
         return filename
     except Exception as e:
         print(f"Warning: Could not save port to file: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return None
 
 def read_port_from_file(filename=None):
@@ -90,37 +148,40 @@ def read_port_from_file(filename=None):
         filename = os.path.join(tempfile.gettempdir(), "nova_app_port.txt")
     
     try:
-        with open(filename, 'r') as f:
-            return int(f.read().strip())
+        with open(filename, 'rb') as f:
+            return int(f.read())
     except Exception:
         return None
 
-# util/helpers.py
-import datetime
+@functools.lru_cache(maxsize=2048)
+def _parse_date_cached(date_str):
+    """Parse a date string that doesn't depend on the current day (raises on failure)."""
+    # Try YYYYMMDD format (cheapest check first)
+    if len(date_str) == 8 and date_str.isdigit():
+        return date_str
+    
+    # Try YYYY-MM-DD format
+    if '-' in date_str:
+        parts = date_str.split('-')
+        if len(parts) == 3:
+            year, month, day = parts
+            return f"{year}{month.zfill(2)}{day.zfill(2)}"
+    
+    # If all else fails, try to parse with datetime
+    dt = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+    return dt.strftime("%Y%m%d")
 
 def parse_date(date_str):
     """Parse date from user input in different formats."""
     try:
-        # Try YYYY-MM-DD format
-        if '-' in date_str:
-            parts = date_str.split('-')
-            if len(parts) == 3:
-                year, month, day = parts
-                return f"{year}{month.zfill(2)}{day.zfill(2)}"
-        
-        # Try YYYYMMDD format
-        if len(date_str) == 8 and date_str.isdigit():
-            return date_str
-        
-        # Try "today", "yesterday", etc.
-        if date_str.lower() == 'today':
+        # "today" and "yesterday" depend on the clock, so they are never cached
+        lowered = date_str.lower()
+        if lowered == 'today':
             return datetime.datetime.now().strftime("%Y%m%d")
-        elif date_str.lower() == 'yesterday':
+        elif lowered == 'yesterday':
             return (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y%m%d")
         
-        # If all else fails, try to parse with datetime
-        dt = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-        return dt.strftime("%Y%m%d")
+        return _parse_date_cached(date_str)
     except:
         print(f"Error: Could not parse date '{date_str}'. Please use YYYY-MM-DD format.")
         return None
@@ -128,45 +189,70 @@ def parse_date(date_str):
 def format_date_for_display(date_str):
     """Format date string for display (YYYYMMDD to Month Day, Year)."""
     try:
-        dt = datetime.datetime.strptime(date_str, "%Y%m%d")
-        return dt.strftime("%B %d, %Y")
+        if len(date_str) != 8 or not date_str.isdigit():
+            return date_str
+        month = int(date_str[4:6])
+        # Rejects impossible dates such as 20240230, as strptime did
+        datetime.date(int(date_str[:4]), month, int(date_str[6:8]))
+        return f"{MONTHS[month - 1]} {date_str[6:8]}, {date_str[:4]}"
     except:
         return date_str
 
+@functools.lru_cache(maxsize=512)
+def _format_day_for_api(day):
+    """Format a date object as YYYYMMDD (cached per day)."""
+    return day.strftime("%Y%m%d")
+
 def format_date_for_api(date):
     """Format datetime object for API (YYYYMMDD)."""
-    return date.strftime("%Y%m%d")
+    # Drop the time of day so every datetime on the same day shares one cache entry
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    return _format_day_for_api(date)
 
-def format_time_ago(timestamp):
+@functools.lru_cache(maxsize=1024)
+def _parse_timestamp(timestamp):
+    """Parse a YYYYMMDD_HHMMSS timestamp by slicing (raises ValueError if malformed)."""
+    if len(timestamp) != 15 or timestamp[8] != '_':
+        raise ValueError(f"Invalid timestamp: {timestamp!r}")
+    return datetime.datetime(int(timestamp[0:4]), int(timestamp[4:6]), int(timestamp[6:8]),
+                             int(timestamp[9:11]), int(timestamp[11:13]), int(timestamp[13:15]))
+
+def format_time_ago(timestamp, now=None):
     """Format a timestamp as a human-readable time ago string."""
-    now = datetime.datetime.now()
+    if now is None:
+        now = datetime.datetime.now()
     if isinstance(timestamp, str):
-        dt = datetime.datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+        dt = _parse_timestamp(timestamp)
     else:
         dt = timestamp
     
-    diff = now - dt
+    days, seconds = divmod(int((now - dt).total_seconds()), SECONDS_PER_DAY)
     
-    if diff.days > 365:
-        years = diff.days // 365
+    if days > 365:
+        years = days // 365
         return f"{years} year{'s' if years != 1 else ''} ago"
-    elif diff.days > 30:
-        months = diff.days // 30
+    elif days > 30:
+        months = days // 30
         return f"{months} month{'s' if months != 1 else ''} ago"
-    elif diff.days > 0:
-        return f"{diff.days} day{'s' if diff.days != 1 else ''} ago"
-    elif diff.seconds > 3600:
-        hours = diff.seconds // 3600
+    elif days > 0:
+        return f"{days} day{'s' if days != 1 else ''} ago"
+    elif seconds > SECONDS_PER_HOUR:
+        hours = seconds // SECONDS_PER_HOUR
         return f"{hours} hour{'s' if hours != 1 else ''} ago"
-    elif diff.seconds > 60:
-        minutes = diff.seconds // 60
+    elif seconds > SECONDS_PER_MINUTE:
+        minutes = seconds // SECONDS_PER_MINUTE
         return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
     else:
         return "just now"
 
+def format_time_ago_batch(timestamps, now=None):
+    """Format many timestamps as time ago strings against a single 'now'."""
+    if now is None:
+        now = datetime.datetime.now()
+    return [format_time_ago(timestamp, now) for timestamp in timestamps]
+
 def ensure_directory(path):
     """Ensure directory exists, create if it doesn't."""
-    import os
-    if not os.path.exists(path):
-        os.makedirs(path)
-    return os.path.exists(path)
+    os.makedirs(path, exist_ok=True)
+    return True